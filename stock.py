@@ -1,23 +1,19 @@
 import os
-import yfinance as yf
 import logging
-import yaml
 import time
 import argparse
 import concurrent.futures
+import functools
+import hashlib
+import json
+import math
 import sys
+import threading
 import termios
 import select
 from pathlib import Path
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.text import Text
-from rich.live import Live
-from rich.console import Group
-from datetime import datetime
-import pandas as pd
-import pytz
+from datetime import date, datetime
+from operator import itemgetter
 
 try:
     from importlib.metadata import version
@@ -31,9 +27,14 @@ except Exception:
 
 # Suppress yfinance logging
 logging.getLogger("yfinance").setLevel(logging.CRITICAL)
-console = Console()
 
 DEFAULT_CONFIG_PATH = Path.home() / ".stock_price.yaml"
+DEFAULT_TOML_CONFIG_PATH = Path.home() / ".stock_price.toml"
+# tomllib joined the stdlib in Python 3.11
+HAS_TOMLLIB = sys.version_info >= (3, 11)
+CACHE_DIR = Path(
+    os.environ.get("STOCK_PRICE_CACHE_DIR", Path.home() / ".cache" / "stock_price")
+)
 
 DEFAULT_HOLDINGS = {
     "SVOL-B.ST": 8367,
@@ -55,106 +56,455 @@ CURRENCY_SYMBOLS = {
     "AUD": "A$",
 }
 
+# Exchanges that quote every listing in a single currency, by Yahoo suffix.
+# Symbols on other exchanges fall back to the ticker metadata.
+EXCHANGE_SUFFIXES = {
+    ".ST": ("SEK", "Europe/Stockholm"),
+    ".CO": ("DKK", "Europe/Copenhagen"),
+    ".OL": ("NOK", "Europe/Oslo"),
+    ".HE": ("EUR", "Europe/Helsinki"),
+    ".PA": ("EUR", "Europe/Paris"),
+    ".DE": ("EUR", "Europe/Berlin"),
+    ".T": ("JPY", "Asia/Tokyo"),
+}
+
+QUOTE_BATCH_SIZE = 20
+RETRY_ATTEMPTS = 3
+HTTP_RETRIES = 2
+
+# FX rates move slowly enough to reuse for an hour. A rate can sit on disk and
+# then in the in-memory table, so each tier keeps it for half of that
+FX_TTL = 3600
+FX_TIER_TTL = FX_TTL // 2
+
+# Pre-bound formatters for table cells
+fmt_qty = "{:,}".format
+fmt_pct = "{:+.2f}%".format
+UP_STYLE, DOWN_STYLE = "green", "red"
+
+# Ticker objects are reused for the lifetime of the process
+_ticker_cache = {}
+
+# Shared worker pool; yahoo_throttle caps request throughput well below what
+# more threads could use
+MAX_WORKERS = 8
+_executor = None
+
+# Client-side pacing of Yahoo requests (requests per second, burst size)
+YAHOO_RATE = 5
+YAHOO_BURST = 10
+_bucket = {"tokens": YAHOO_BURST, "ts": 0.0}
+_bucket_lock = threading.Lock()
+
+# yf.download collects results in module-global state before yfinance 1.6, so
+# concurrent downloads from pool threads would mix up each other's frames
+_download_lock = threading.Lock()
+
+# In-flight FX fetches by (source, target) pair
+_rate_inflight = {}
+_rate_lock = threading.Lock()
+
+# Horizontal segments at different heights draw a clean, bold sparkline
+SPARK_CHARS = "⎽⎼⎻⎺"
+SPARK_NUMPY_MIN = 32
+
+# Minimum seconds between partial redraws while a refresh is in flight
+RENDER_INTERVAL = 0.25
 
-def load_config(config_path=None):
-    config_data = {"holdings": DEFAULT_HOLDINGS, "currency": "EUR"}
 
-    # Priority: 1. CLI Arg, 2. Env Var, 3. Default Path
+@functools.lru_cache(maxsize=None)
+def get_console():
+    # Rich is imported on first output, so --help and --version skip it
+    from rich.console import Console
+
+    return Console()
+
+
+def parse_holdings(raw_holdings):
+    # Holdings are either `SYMBOL: qty` or `SYMBOL: {qty: n, div: false}`
+    holdings = {}
+    skip_dividends = set()
+    for symbol, entry in raw_holdings.items():
+        if isinstance(entry, dict):
+            holdings[symbol] = entry["qty"]
+            if not entry.get("div", True):
+                skip_dividends.add(symbol)
+        else:
+            holdings[symbol] = entry
+    return holdings, skip_dividends
+
+
+def read_config_file(path):
+    # TOML is parsed by the stdlib (Python 3.11+), so PyYAML is only imported
+    # for YAML configs
+    if path.suffix == ".toml":
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+
+    import yaml
+
+    # Prefer the libyaml C loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=loader)
+
+
+def load_config(config_path=None):
+    config_data = {
+        "holdings": DEFAULT_HOLDINGS,
+        "currency": "EUR",
+        "skip_dividends": set(),
+    }
+
+    # Priority: 1. CLI Arg, 2. Env Var, 3. Default Path (TOML before YAML
+    # where the stdlib can parse it)
     resolved_path = Path(config_path) if config_path else None
     if not resolved_path:
         env_path = os.environ.get("STOCK_PRICE_CONFIG")
-        resolved_path = Path(env_path) if env_path else DEFAULT_CONFIG_PATH
+        if env_path:
+            resolved_path = Path(env_path)
+        elif HAS_TOMLLIB and DEFAULT_TOML_CONFIG_PATH.exists():
+            resolved_path = DEFAULT_TOML_CONFIG_PATH
+        else:
+            resolved_path = DEFAULT_CONFIG_PATH
 
     if resolved_path.exists():
         try:
-            with open(resolved_path, "r") as f:
-                user_config = yaml.safe_load(f)
-                if user_config:
-                    if "holdings" in user_config:
-                        config_data["holdings"] = user_config["holdings"]
-                    if "currency" in user_config:
-                        config_data["currency"] = user_config["currency"].upper()
+            user_config = read_config_file(resolved_path)
+            if user_config:
+                if "holdings" in user_config:
+                    (
+                        config_data["holdings"],
+                        config_data["skip_dividends"],
+                    ) = parse_holdings(user_config["holdings"])
+                if "currency" in user_config:
+                    config_data["currency"] = user_config["currency"].upper()
         except Exception as e:
-            console.print(f"[red]Error loading config ({resolved_path}):[/red] {e}")
+            get_console().print(
+                f"[red]Error loading config ({resolved_path}):[/red] {e}"
+            )
     elif config_path:
-        console.print(
+        get_console().print(
             f"[yellow]Warning: Config file not found at {config_path}[/yellow]"
         )
 
     return config_data
 
 
-def validate_currency(currency_code):
-    currency_code = currency_code.upper()
-    if len(currency_code) != 3:
-        return False
-    if currency_code == "USD":
-        return True
+def disk_cache(ttl_seconds, negative_ttl=0):
+    # Persist JSON-serializable results across runs, keyed by function and args.
+    # None results are only kept when negative_ttl is set
+    def decorator(func):
+        def entry_path(args):
+            key = json.dumps([func.__name__, args])
+            return CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            path = entry_path(args)
+            try:
+                entry = json.loads(path.read_text())
+                ttl = ttl_seconds if entry["value"] is not None else negative_ttl
+                if time.time() - entry["ts"] < ttl:
+                    return entry["value"]
+            except Exception:
+                pass
+
+            value = func(*args)
+            if value is not None or negative_ttl:
+                try:
+                    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                    path.write_text(json.dumps({"ts": time.time(), "value": value}))
+                except Exception:
+                    pass
+            return value
+
+        def invalidate(*args):
+            entry_path(args).unlink(missing_ok=True)
+
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_WORKERS, thread_name_prefix="yf"
+        )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        # Drop queued tasks so exit only waits for requests already in flight
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+@functools.lru_cache(maxsize=None)
+def transient_errors():
+    # Network failures from requests/curl_cffi are all OSError subclasses
     try:
-        ticker = yf.Ticker(f"USD{currency_code}=X")
+        from yfinance.exceptions import YFRateLimitError
+    except ImportError:
+        return (OSError,)
+    return (OSError, YFRateLimitError)
+
+
+def yahoo_throttle(requests=1):
+    # Token bucket with one token per HTTP request: bursts beyond YAHOO_BURST
+    # wait here for a slot instead of tripping Yahoo's 429s and the much
+    # longer retry backoff
+    with _bucket_lock:
+        now = time.monotonic()
+        tokens = min(
+            YAHOO_BURST, _bucket["tokens"] + (now - _bucket["ts"]) * YAHOO_RATE
+        )
+        _bucket["tokens"] = tokens - requests
+        _bucket["ts"] = now
+    if tokens < requests:
+        time.sleep((requests - tokens) / YAHOO_RATE)
+
+
+def retry_transient(func):
+    # Retry rate limiting and connection errors with exponential backoff
+    @functools.wraps(func)
+    def wrapper(*args):
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return func(*args)
+            except transient_errors():
+                if attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                time.sleep(2**attempt)
+
+    return wrapper
+
+
+def yf_ticker(symbol):
+    ticker = _ticker_cache.get(symbol)
+    if ticker is None:
+        import yfinance as yf
+
+        ticker = _ticker_cache.setdefault(symbol, yf.Ticker(symbol))
+    return ticker
+
+
+@functools.lru_cache(maxsize=None)
+@disk_cache(ttl_seconds=7 * 86400)
+@retry_transient
+def fetch_ticker_meta(symbol):
+    # Currency and exchange timezone never change for a symbol
+    yahoo_throttle()
+    fi = yf_ticker(symbol).fast_info
+    return fi.get("currency", "USD"), fi.get("timezone", "UTC")
+
+
+def suffix_meta(symbol):
+    _, dot, suffix = symbol.rpartition(".")
+    return EXCHANGE_SUFFIXES.get(f".{suffix}") if dot else None
+
+
+def get_ticker_meta(symbol):
+    return suffix_meta(symbol) or fetch_ticker_meta(symbol)
+
+
+@functools.lru_cache(maxsize=64)
+@disk_cache(ttl_seconds=30 * 86400)
+def probe_currency(currency_code):
+    # Only successful probes are returned (and so persisted); failures retry
+    yahoo_throttle()
+    try:
+        ticker = yf_ticker(f"USD{currency_code}=X")
         if ticker.fast_info.get("lastPrice"):
             return True
     except Exception:
         pass
-    return False
+    return None
+
+
+def validate_currency(currency_code):
+    currency_code = currency_code.upper()
+    if len(currency_code) != 3:
+        return False
+    if currency_code in CURRENCY_SYMBOLS:
+        return True
+    return bool(probe_currency(currency_code))
+
+
+@disk_cache(ttl_seconds=FX_TIER_TTL)
+def fetch_rate(source, target):
+    direct = f"{source}{target}=X"
+    quotes = fetch_quotes([direct])
+    if direct in quotes:
+        return quotes[direct]["price"]
+    # Pairs Yahoo does not list directly fall back to the inverse pair
+    inverse = f"{target}{source}=X"
+    quotes = fetch_quotes([inverse])
+    if inverse in quotes and quotes[inverse]["price"]:
+        return 1 / quotes[inverse]["price"]
+    return None
 
 
 def get_rate(source, target, cache):
+    # cache maps source currency -> rate for a single target currency
     if source == target:
         return 1.0
-    pair = f"{source}{target}=X"
-    if pair in cache:
-        return cache[pair]
-    try:
-        ticker = yf.Ticker(pair)
-        rate = ticker.fast_info["lastPrice"]
-        cache[pair] = rate
+    rate = cache.get(source)
+    if rate is not None:
         return rate
-    except Exception:
-        try:
-            inverse_pair = f"{target}{source}=X"
-            ticker = yf.Ticker(inverse_pair)
-            rate = 1 / ticker.fast_info["lastPrice"]
-            cache[pair] = rate
+
+    # Concurrent misses for the same pair wait on the first thread's fetch
+    key = (source, target)
+    with _rate_lock:
+        # A fetch may have finished between the lookup above and taking the lock
+        rate = cache.get(source)
+        if rate is not None:
             return rate
+        pending = _rate_inflight.get(key)
+        if pending is None:
+            _rate_inflight[key] = future = concurrent.futures.Future()
+    if pending is not None:
+        return pending.result()
+
+    rate = None
+    try:
+        rate = fetch_rate(source, target)
+        if rate is not None:
+            cache[source] = rate
+    finally:
+        with _rate_lock:
+            del _rate_inflight[key]
+        future.set_result(rate)
+    return rate
+
+
+@disk_cache(ttl_seconds=FX_TIER_TTL)
+def fetch_rates(currencies, target):
+    pairs = {f"{c}{target}=X": c for c in currencies}
+    quotes = fetch_quotes(list(pairs))
+    rates = {c: quotes[pair]["price"] for pair, c in pairs.items() if pair in quotes}
+    return rates or None
+
+
+def prefetch_rates(holdings, target_currency, rate_cache):
+    # Resolve rates for currencies known from the exchange suffix up front in
+    # one batched download, so ticker tasks only need a dict lookup
+    currencies = {meta[0] for meta in map(suffix_meta, holdings) if meta}
+    missing = sorted(currencies - rate_cache.keys() - {target_currency})
+    if missing:
+        rate_cache.update(fetch_rates(missing, target_currency) or {})
+        # Pairs Yahoo does not list directly fall back to the inverse pair
+        for currency in missing:
+            get_rate(currency, target_currency, rate_cache)
+
+
+def download_closes(symbols, period):
+    import pandas as pd
+    import yfinance as yf
+
+    frames = []
+    # yf.download fires one chart request per symbol all at once, so batches
+    # never exceed what the pacing bucket allows in a single burst
+    batch_size = min(QUOTE_BATCH_SIZE, YAHOO_BURST)
+    for i in range(0, len(symbols), batch_size):
+        batch = symbols[i : i + batch_size]
+        yahoo_throttle(len(batch))
+        try:
+            with _download_lock:
+                df = yf.download(
+                    batch,
+                    period=period,
+                    interval="1d",
+                    auto_adjust=False,
+                    progress=False,
+                    threads=True,
+                    timeout=10,
+                )
         except Exception:
-            return None
+            continue
 
+        if df.empty:
+            continue
 
-def get_ticker_summary(symbol, qty, target_currency, rate_cache):
+        close_data = df["Close"]
+        if isinstance(close_data, pd.Series):
+            close_data = pd.DataFrame({batch[0]: close_data})
+        frames.append(close_data)
+
+    if not frames:
+        return None
+    return frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+
+
+def quotes_from_closes(close_data):
+    import numpy as np
+
+    # Read the last two closes straight from the ndarray instead of
+    # building a Series per symbol
+    values = close_data.to_numpy(dtype=float)
+    num_cols = values.shape[1]
+    price = np.full(num_cols, np.nan)
+    prev = np.full(num_cols, np.nan)
+    last_rows = np.full(num_cols, -1)
+    for col in range(num_cols):
+        rows = np.flatnonzero(~np.isnan(values[:, col]))
+        if rows.size:
+            last_rows[col] = rows[-1]
+            price[col] = values[rows[-1], col]
+            if rows.size >= 2:
+                prev[col] = values[rows[-2], col]
+
+    # Day change for every symbol in one vectorized expression
+    has_prev = ~np.isnan(prev) & (prev != 0)
+    chg_pct = (
+        np.divide(price - prev, prev, out=np.zeros_like(price), where=has_prev) * 100
+    )
+
+    quotes = {}
+    for col, sym in enumerate(close_data.columns):
+        if last_rows[col] >= 0:
+            quotes[sym] = {
+                "price": float(price[col]),
+                "prev_close": float(prev[col]) if has_prev[col] else None,
+                "chg_pct": float(chg_pct[col]),
+                "last_date": close_data.index[last_rows[col]].date(),
+            }
+    return quotes
+
+
+def fetch_quotes(symbols):
+    close_data = download_closes(symbols, "5d")
+    return quotes_from_closes(close_data) if close_data is not None else {}
+
+
+def get_ticker_summary(symbol, qty, target_currency, rate_cache, quote):
     try:
-        t = yf.Ticker(symbol)
-        fi = t.fast_info
-        price = fi.get("lastPrice")
-        prev_close = fi.get("regularMarketPreviousClose") or fi.get("previousClose")
-        source_currency = fi.get("currency", "USD")
+        price = quote["price"]
+        prev_close = quote["prev_close"]
+        source_currency, tz_name = get_ticker_meta(symbol)
         conv = get_rate(source_currency, target_currency, rate_cache)
 
         if price is not None and conv is not None:
             # Check if market has opened today
-            is_today = False
             try:
-                tz_name = fi.get("timezone", "UTC")
-                tz = pytz.timezone(tz_name)
-                today = datetime.now(tz).date()
+                import pytz
 
-                # Using history(period='1d') to get the latest session date
-                try:
-                    hist = t.history(period="1d", timeout=5)
-                    if not hist.empty:
-                        last_date = hist.index[-1].date()
-                        if last_date == today:
-                            is_today = True
-                except Exception:
-                    # Fallback if history fails
-                    is_today = True
+                tz = pytz.timezone(tz_name)
+                is_today = quote["last_date"] == datetime.now(tz).date()
             except Exception:
                 is_today = True  # Fallback to showing change
 
             val_now = (price * conv) * qty
             if is_today:
                 val_prev = (prev_close * conv) * qty if prev_close else val_now
-                chg_pct = ((price - prev_close) / prev_close) * 100 if prev_close else 0
+                chg_pct = quote["chg_pct"]
             else:
                 val_prev = val_now
                 chg_pct = 0
@@ -167,7 +517,6 @@ def get_ticker_summary(symbol, qty, target_currency, rate_cache):
                 "val_prev": val_prev,
                 "chg_pct": chg_pct,
                 "daily_chg_val": daily_chg_val,
-                "ticker_obj": t,
                 "conv": conv,
                 "source_currency": source_currency,
             }
@@ -176,171 +525,229 @@ def get_ticker_summary(symbol, qty, target_currency, rate_cache):
     return None
 
 
-def get_dividend_data(summary_data):
+# Most tickers have no upcoming dividend most of the time, so remember that too
+@disk_cache(ttl_seconds=86400, negative_ttl=6 * 3600)
+@retry_transient
+def fetch_dividend_info(symbol):
+    import yfinance as yf
+
+    # Fresh Ticker objects here: yfinance memoizes the calendar per instance,
+    # so a shared one would never see the next ex-date
+    t = yf.Ticker(symbol)
+    yahoo_throttle()
+    cal = t.calendar
+    if cal and "Ex-Dividend Date" in cal:
+        ex_date = cal["Ex-Dividend Date"]
+        if ex_date and ex_date >= datetime.now().date():
+            # Last paid amount from recent history, avoiding t.info and the
+            # full-history download behind t.dividends
+            yahoo_throttle()
+            hist = t.history(period="2y", actions=True)
+            dividends = hist.get("Dividends")
+            paid = dividends[dividends > 0] if dividends is not None else ()
+            div_amt = float(paid.iloc[-1]) if len(paid) else 0
+            if div_amt > 0:
+                return ex_date.isoformat(), div_amt
+    return None
+
+
+def get_dividend_data(summary_data, today):
     try:
-        t = summary_data["ticker_obj"]
-        cal = t.calendar
-        if cal and "Ex-Dividend Date" in cal:
-            ex_date = cal["Ex-Dividend Date"]
-            if ex_date and ex_date >= datetime.now().date():
-                d_info = t.info
-                div_amt = (
-                    d_info.get("lastDividendValue") or d_info.get("dividendRate") or 0
-                )
-                if div_amt > 0:
-                    return {
-                        "symbol": summary_data["symbol"],
-                        "ex_date": ex_date,
-                        "amt": div_amt,
-                        "total_p": (div_amt * summary_data["conv"])
-                        * summary_data["qty"],
-                        "cur_label": CURRENCY_SYMBOLS.get(
-                            summary_data["source_currency"],
-                            summary_data["source_currency"],
-                        ),
-                    }
+        info = fetch_dividend_info(summary_data["symbol"])
+        if info and date.fromisoformat(info[0]) < today:
+            # The cached ex-date has passed; look up the next one now rather
+            # than when the cache entry expires
+            fetch_dividend_info.invalidate(summary_data["symbol"])
+            info = fetch_dividend_info(summary_data["symbol"])
+        if info:
+            ex_date = date.fromisoformat(info[0])
+            div_amt = info[1]
+            if ex_date >= today:
+                return {
+                    "symbol": summary_data["symbol"],
+                    "ex_date": ex_date,
+                    "amt": div_amt,
+                    "total_p": (div_amt * summary_data["conv"]) * summary_data["qty"],
+                    "cur_label": CURRENCY_SYMBOLS.get(
+                        summary_data["source_currency"],
+                        summary_data["source_currency"],
+                    ),
+                }
     except Exception:
         pass
     return None
 
 
-def render_sparkline(values):
+def get_ticker_data(
+    symbol, qty, target_currency, rate_cache, quote, today, track_dividends=True
+):
+    summary = get_ticker_summary(symbol, qty, target_currency, rate_cache, quote)
+    dividend = (
+        get_dividend_data(summary, today) if summary and track_dividends else None
+    )
+    return summary, dividend
 
-    if not values or len(values) < 2:
-        return ""
 
-    # Use horizontal segments at different heights for a clean, bold line
+@functools.lru_cache(maxsize=None)
+def spark_glyphs():
+    import numpy as np
 
-    chars = ["⎽", "⎼", "⎻", "⎺"]
+    # Fixed-width UTF-32 so a gathered array decodes straight to a string
+    return np.array(list(SPARK_CHARS), dtype="<U1")
 
-    min_v, max_v = min(values), max(values)
 
-    span = max_v - min_v
+def render_sparkline_np(values):
+    import numpy as np
+
+    arr = np.asarray(values, dtype=float)
+    min_v = arr.min()
+    span = arr.max() - min_v
+    if span <= 0:
+        return "─" * len(arr)
+
+    top = len(SPARK_CHARS) - 1
+    idx = np.minimum(((arr - min_v) / span * top).astype(np.intp), top)
+    return spark_glyphs()[idx].tobytes().decode("utf-32-le")
+
 
+def render_sparkline(values):
+    if not values or len(values) < 2:
+        return ""
+    # NumPy only pays off once the per-point Python loop dominates
+    if len(values) > SPARK_NUMPY_MIN:
+        return render_sparkline_np(values)
+
+    min_v, max_v = min(values), max(values)
+    span = max_v - min_v
     if span <= 0:
         return "─" * len(values)
 
-    return "".join(chars[min(int((v - min_v) / span * 3), 3)] for v in values)
+    chars = SPARK_CHARS
+    top = len(chars) - 1
+    return "".join(chars[min(int((v - min_v) / span * top), top)] for v in values)
 
 
-def fetch_history(holdings, target_currency, ticker_to_currency):
+def meta_currency(symbol):
     try:
-        symbols = list(holdings.keys())
-        currencies = set(ticker_to_currency.values())
-        rate_pairs = [
-            f"{c}{target_currency}=X" for c in currencies if c != target_currency
-        ]
-
-        all_to_fetch = symbols + rate_pairs
-        df = yf.download(
-            all_to_fetch,
-            period="1mo",
-            interval="1d",
-            progress=False,
-            threads=True,
-            timeout=10,
-        )
+        return get_ticker_meta(symbol)[0]
+    except Exception:
+        return "USD"
 
-        if df.empty:
-            return [], {}
 
-        close_data = df["Close"]
-        if isinstance(close_data, pd.Series):
-            sym = all_to_fetch[0]
-            close_data = pd.DataFrame({sym: close_data})
+def history_pairs(symbols, target_currency):
+    # FX pairs needed to value the history, mapped to their source currency.
+    # Suffix-less symbols need their (disk-cached) metadata, looked up on the pool
+    currencies = set(get_executor().map(meta_currency, symbols))
+    return {
+        f"{c}{target_currency}=X": c for c in sorted(currencies - {target_currency})
+    }
 
-        # Calculate monthly change for each ticker
-        monthly_changes = {}
-        for sym in symbols:
-            if sym in close_data.columns:
-                series = close_data[sym].dropna()
-                if len(series) >= 2:
-                    start_price = series.iloc[0]
-                    end_price = series.iloc[-1]
-                    monthly_changes[sym] = (
-                        (end_price - start_price) / start_price
-                    ) * 100
-
-        history_totals = []
-        for _, row in close_data.iterrows():
-            daily_total = 0
-            has_data = False
-            for sym, qty in holdings.items():
-                if sym in row and not pd.isna(row[sym]):
-                    src_curr = ticker_to_currency.get(sym, "USD")
-                    rate = 1.0
-                    if src_curr != target_currency:
-                        r_sym = f"{src_curr}{target_currency}=X"
-                        rate = (
-                            row[r_sym]
-                            if r_sym in row and not pd.isna(row[r_sym])
-                            else 1.0
-                        )
 
-                    daily_total += row[sym] * qty * rate
-                    has_data = True
+def history_from_closes(close_data, holdings, target_currency, ticker_to_currency):
+    import numpy as np
 
-            if has_data:
-                history_totals.append(daily_total)
+    try:
+        symbols = list(holdings.keys())
+        held = [sym for sym in symbols if sym in close_data.columns]
+        prices = close_data[held].to_numpy(dtype=float)
+        valid = ~np.isnan(prices)
+
+        # Monthly change from each ticker's first and last close
+        monthly_changes = {}
+        for col, sym in enumerate(held):
+            rows = np.flatnonzero(valid[:, col])
+            if rows.size >= 2:
+                start_price = prices[rows[0], col]
+                end_price = prices[rows[-1], col]
+                monthly_changes[sym] = ((end_price - start_price) / start_price) * 100
+
+        # Value every day in one reduction: prices x quantities x FX rates,
+        # with missing prices contributing nothing and missing rates as 1.0
+        rates = np.ones_like(prices)
+        for col, sym in enumerate(held):
+            src_curr = ticker_to_currency.get(sym, "USD")
+            r_sym = f"{src_curr}{target_currency}=X"
+            if src_curr != target_currency and r_sym in close_data.columns:
+                rates[:, col] = close_data[r_sym].to_numpy(dtype=float)
+        rates[np.isnan(rates)] = 1.0
+        qtys = np.array([holdings[sym] for sym in held], dtype=float)
+
+        has_data = valid.any(axis=1)
+        totals = (np.nan_to_num(prices) * qtys * rates).sum(axis=1)
+        history_totals = totals[has_data].tolist()
 
         return history_totals, monthly_changes
     except Exception:
         return [], {}
 
 
-def build_display_group(
+@functools.lru_cache(maxsize=None)
+def display_labels(target_currency):
+    # Target currency is fixed for a run; build its labels only once
+    target_symbol = CURRENCY_SYMBOLS.get(target_currency, target_currency)
+    return (
+        target_symbol,
+        f"Portfolio Summary ({target_currency})",
+        f"Value ({target_symbol})",
+        f"Daily ({target_symbol})",
+        f"Total ({target_symbol})",
+    )
+
+
+def build_static(
     summary_results,
     dividend_results,
     target_currency,
-    footer_text="",
     history_points=None,
     monthly_changes=None,
 ):
-    target_symbol = CURRENCY_SYMBOLS.get(target_currency, target_currency)
+    from rich.panel import Panel
+    from rich.table import Table
+    from rich.text import Text
+
+    target_symbol, title, value_title, daily_title, total_title = display_labels(
+        target_currency
+    )
     monthly_changes = monthly_changes or {}
+    fmt_val = f"{{:,.2f}} {target_symbol}".format
+    fmt_chg = f"{{:+,.2f}} {target_symbol}".format
 
     # 1. Summary Table (No expand=True to keep it compact)
-    table = Table(
-        title=f"Portfolio Summary ({target_currency})", header_style="bold cyan"
-    )
+    table = Table(title=title, header_style="bold cyan")
     table.add_column("Ticker", width=12, no_wrap=True)
     table.add_column("Quantity", justify="right", width=10, no_wrap=True)
     table.add_column(
-        f"Value ({target_symbol})",
+        value_title,
         justify="right",
         style="bold white",
         width=15,
         no_wrap=True,
     )
-    table.add_column(
-        f"Daily ({target_symbol})", justify="right", width=12, no_wrap=True
-    )
+    table.add_column(daily_title, justify="right", width=12, no_wrap=True)
     table.add_column("Day %", justify="right", width=10, no_wrap=True)
     table.add_column("Month %", justify="right", width=10, no_wrap=True)
 
-    total_val = 0
-    total_prev = 0
-    for s in sorted(summary_results, key=lambda x: x["symbol"]):
-        total_val += s["val_now"]
-        total_prev += s["val_prev"]
-
+    total_val = math.fsum(map(itemgetter("val_now"), summary_results))
+    total_prev = math.fsum(map(itemgetter("val_prev"), summary_results))
+    for s in summary_results:
         m_chg = monthly_changes.get(s["symbol"])
         m_text = (
-            Text(f"{m_chg:+.2f}%", style="green" if m_chg >= 0 else "red")
+            Text(fmt_pct(m_chg), style=UP_STYLE if m_chg >= 0 else DOWN_STYLE)
             if m_chg is not None
             else Text("-", style="dim")
         )
 
         table.add_row(
             s["symbol"],
-            f"{s['qty']:,}",
-            f"{s['val_now']:,.2f} {target_symbol}",
+            fmt_qty(s["qty"]),
+            fmt_val(s["val_now"]),
             Text(
-                f"{s['daily_chg_val']:+,.2f} {target_symbol}",
-                style="green" if s["daily_chg_val"] >= 0 else "red",
+                fmt_chg(s["daily_chg_val"]),
+                style=UP_STYLE if s["daily_chg_val"] >= 0 else DOWN_STYLE,
             ),
             Text(
-                f"{s['chg_pct']:+.2f}%", style="green" if s["chg_pct"] >= 0 else "red"
+                fmt_pct(s["chg_pct"]),
+                style=UP_STYLE if s["chg_pct"] >= 0 else DOWN_STYLE,
             ),
             m_text,
         )
@@ -353,18 +760,18 @@ def build_display_group(
         div_table.add_column("Ex-Date", justify="center", width=12, no_wrap=True)
         div_table.add_column("Amount", justify="right", width=12, no_wrap=True)
         div_table.add_column(
-            f"Total ({target_symbol})",
+            total_title,
             justify="right",
             style="green",
             width=15,
             no_wrap=True,
         )
-        for d in sorted(dividend_results, key=lambda x: x["ex_date"]):
+        for d in sorted(dividend_results, key=itemgetter("ex_date")):
             div_table.add_row(
                 d["symbol"],
                 str(d["ex_date"]),
                 f"{d['amt']:.2f} {d['cur_label']}",
-                f"{d['total_p']:,.2f} {target_symbol}",
+                fmt_val(d["total_p"]),
             )
 
     # 3. Summary Panel
@@ -372,39 +779,48 @@ def build_display_group(
     if total_prev > 0:
         day_chg_pct = ((total_val - total_prev) / total_prev) * 100
         day_chg_val = total_val - total_prev
-        summary_text = Text.assemble(
-            ("TOTAL VALUE:  ", "white"),
-            (f"{total_val:,.2f} {target_symbol}\n", "bold white"),
-            ("DAY CHANGE:   ", "white"),
-            (
-                f"{day_chg_val:+,.2f} {target_symbol} ",
-                "bold green" if day_chg_val >= 0 else "bold red",
-            ),
-            (
-                f"({day_chg_pct:+.2f}%)",
-                "bold green" if day_chg_pct >= 0 else "bold red",
-            ),
+        chg_style = "bold green" if day_chg_val >= 0 else "bold red"
+        # Panel text is a single markup f-string rather than appended Text segments
+        summary_text = (
+            f"[white]TOTAL VALUE:  [/][bold white]{total_val:,.2f} {target_symbol}[/]\n"
+            f"[white]DAY CHANGE:   [/][{chg_style}]{day_chg_val:+,.2f} {target_symbol} "
+            f"({day_chg_pct:+.2f}%)[/]"
         )
 
         if history_points and len(history_points) > 1:
             spark = render_sparkline(history_points)
-            summary_text.append("\n\n")
-            summary_text.append("30D DEVELOPMENT:\n", style="dim")
-            summary_text.append(spark, style="bright_cyan")
+            summary_text += f"\n\n[dim]30D DEVELOPMENT:[/]\n[bright_cyan]{spark}[/]"
 
         summary_panel = Panel(summary_text, border_style="bright_blue", expand=False)
 
-    # 4. Footer
+    return tuple(e for e in (table, div_table, summary_panel) if e)
+
+
+def build_group(static, footer_text=""):
+    from rich.console import Group
+    from rich.text import Text
+
+    # Only the footer changes between redraws of the same data
     footer = Text(footer_text, style="dim italic") if footer_text else Text("")
+    return Group(*static, footer)
 
-    elements = [table]
-    if div_table:
-        elements.append(div_table)
-    if summary_panel:
-        elements.append(summary_panel)
-    elements.append(footer)
 
-    return Group(*elements)
+def build_display_group(
+    summary_results,
+    dividend_results,
+    target_currency,
+    footer_text="",
+    history_points=None,
+    monthly_changes=None,
+):
+    static = build_static(
+        summary_results,
+        dividend_results,
+        target_currency,
+        history_points,
+        monthly_changes,
+    )
+    return build_group(static, footer_text)
 
 
 def fetch_portfolio():
@@ -416,12 +832,25 @@ def fetch_portfolio():
     parser.add_argument(
         "-w", "--watch", action="store_true", help="Watch mode: update every 5 seconds"
     )
-    parser.add_argument("--config", help="Path to a custom YAML configuration file")
+    parser.add_argument(
+        "--config", help="Path to a custom YAML or TOML configuration file"
+    )
     args = parser.parse_args()
 
     config = load_config(args.config)
     target_currency = (args.currency or config["currency"]).upper()
     holdings = config["holdings"]
+    skip_dividends = config["skip_dividends"]
+
+    # Heavy imports are deferred until after argument parsing so that
+    # --version and --help return immediately
+    import yfinance as yf
+    from rich.live import Live
+
+    # Let yfinance retry transient connection errors on its shared session,
+    # which also covers the requests made inside yf.download
+    if hasattr(yf, "config"):
+        yf.config.network.retries = HTTP_RETRIES
 
     # Set terminal title
     if sys.stdout.isatty():
@@ -430,23 +859,33 @@ def fetch_portfolio():
 
     try:
         if not validate_currency(target_currency):
-            console.print(
+            get_console().print(
                 f"[bold red]ERROR:[/bold red] '{target_currency}' is not a valid ISO currency code."
             )
             sys.exit(1)
 
-        summary_cache = {}
+        # Holdings are fixed for the run, so order them once. summary_cache is
+        # seeded in symbol order so rows come out sorted without re-sorting on
+        # every redraw
+        holding_items = sorted(holdings.items())
+        symbols = [symbol for symbol, _ in holding_items]
+        summary_cache = dict.fromkeys(symbols)
         dividend_cache = {}
         history_points = []
         monthly_changes = {}
         last_history_update = 0
+        rate_cache = {}
+        last_rate_update = 0
         ticker_to_currency = {}
-        last_update = "Initializing..."
+
+        def summary_rows():
+            return [row for row in summary_cache.values() if row]
 
         with Live(
             build_display_group([], [], target_currency, "Initializing..."),
-            console=console,
-            refresh_per_second=4,
+            console=get_console(),
+            # Repaint only when the data changes, not on a fixed timer
+            auto_refresh=False,
             transient=True,
             screen=args.watch,
         ) as live:
@@ -466,74 +905,128 @@ def fetch_portfolio():
 
             try:
                 while True:
-                    rate_cache = {}
-
-                    # Fetch data
-                    num_holdings = len(holdings)
-                    completed = 0
-                    with concurrent.futures.ThreadPoolExecutor(
-                        max_workers=num_holdings
-                    ) as executor:
-                        future_to_symbol = {
-                            executor.submit(
-                                get_ticker_summary, s, q, target_currency, rate_cache
-                            ): s
-                            for s, q in holdings.items()
+                    # FX rates are reused across refreshes, at most FX_TTL
+                    # old counting the time they spent on disk
+                    if time.time() - last_rate_update > FX_TIER_TTL:
+                        rate_cache = {}
+                        last_rate_update = time.time()
+                    executor = get_executor()
+                    today = date.today()
+
+                    # Fetch prices and uncached FX rates in one batched
+                    # download. When the 30D history is due (every 120s), a
+                    # 1mo download of holdings and all their FX pairs serves
+                    # the quotes, the rates and the history
+                    history_due = (
+                        time.time() - last_history_update > 120 or not history_points
+                    )
+                    if history_due:
+                        pairs = history_pairs(symbols, target_currency)
+                    else:
+                        currencies = {m[0] for m in map(suffix_meta, symbols) if m}
+                        pairs = {
+                            f"{c}{target_currency}=X": c
+                            for c in sorted(
+                                currencies - rate_cache.keys() - {target_currency}
+                            )
                         }
-                        try:
-                            for future in concurrent.futures.as_completed(
-                                future_to_symbol, timeout=15
+                    close_data = download_closes(
+                        symbols + list(pairs), "1mo" if history_due else "5d"
+                    )
+                    quotes = (
+                        quotes_from_closes(close_data) if close_data is not None else {}
+                    )
+                    for pair, currency in pairs.items():
+                        if pair in quotes:
+                            rate_cache[currency] = quotes[pair]["price"]
+                    # Only pairs missing from the download still need a lookup
+                    prefetch_rates(holdings, target_currency, rate_cache)
+                    completed = 0
+                    static = None
+                    last_render = 0
+                    future_to_symbol = {
+                        executor.submit(
+                            get_ticker_data,
+                            s,
+                            q,
+                            target_currency,
+                            rate_cache,
+                            quotes[s],
+                            today,
+                            s not in skip_dividends,
+                        ): s
+                        for s, q in holding_items
+                        if s in quotes
+                    }
+                    num_holdings = len(future_to_symbol)
+                    try:
+                        for future in concurrent.futures.as_completed(
+                            future_to_symbol, timeout=15
+                        ):
+                            res, div = future.result()
+                            symbol = future_to_symbol[future]
+                            completed += 1
+                            if res:
+                                summary_cache[symbol] = res
+                                ticker_to_currency[symbol] = res["source_currency"]
+                                if div:
+                                    dividend_cache[symbol] = div
+                                else:
+                                    dividend_cache.pop(symbol, None)
+
+                            # Rebuilding the tables per future is O(N) each, so
+                            # coalesce partial redraws to the Live refresh rate
+                            # and skip them when no row changed
+                            now = time.monotonic()
+                            if completed < num_holdings and (
+                                not res or now - last_render < RENDER_INTERVAL
                             ):
-                                res = future.result()
-                                symbol = future_to_symbol[future]
-                                completed += 1
-                                if res:
-                                    summary_cache[symbol] = res
-                                    ticker_to_currency[symbol] = res["source_currency"]
-
-                                live.update(
-                                    build_display_group(
-                                        list(summary_cache.values()),
-                                        list(dividend_cache.values()),
-                                        target_currency,
-                                        f"Updating ({completed}/{num_holdings})...",
-                                        history_points,
-                                        monthly_changes,
-                                    )
-                                )
-                        except concurrent.futures.TimeoutError:
-                            # Continue with what we have if some requests timed out
-                            pass
-
-                    # Fetch 30D history if needed (every 120s)
-                    now = time.time()
-                    if ticker_to_currency and (
-                        now - last_history_update > 120 or not history_points
-                    ):
-                        new_history, new_monthly = fetch_history(
-                            holdings, target_currency, ticker_to_currency
+                                continue
+                            last_render = now
+                            static = build_static(
+                                summary_rows(),
+                                list(dividend_cache.values()),
+                                target_currency,
+                                history_points,
+                                monthly_changes,
+                            )
+                            live.update(
+                                build_group(
+                                    static, f"Updating ({completed}/{num_holdings})..."
+                                ),
+                                refresh=True,
+                            )
+                    except concurrent.futures.TimeoutError:
+                        # Continue with what we have if some requests timed out;
+                        # rows that arrived since the last render need a rebuild
+                        static = None
+
+                    # Derive the 30D history from this refresh's download
+                    if history_due:
+                        if close_data is not None:
+                            new_history, new_monthly = history_from_closes(
+                                close_data,
+                                holdings,
+                                target_currency,
+                                ticker_to_currency,
+                            )
+                            if new_history:
+                                history_points = new_history
+                            if new_monthly:
+                                monthly_changes.update(new_monthly)
+                        last_history_update = time.time()
+                        static = None
+
+                    # Reuse the tables from the last partial render unless
+                    # the history refresh changed them
+                    if static is None:
+                        static = build_static(
+                            summary_rows(),
+                            list(dividend_cache.values()),
+                            target_currency,
+                            history_points,
+                            monthly_changes,
                         )
-                        if new_history:
-                            history_points = new_history
-                        if new_monthly:
-                            monthly_changes.update(new_monthly)
-                        last_history_update = now
-
-                    if summary_cache:
-                        with concurrent.futures.ThreadPoolExecutor(
-                            max_workers=len(summary_cache)
-                        ) as executor:
-                            div_future_to_symbol = {
-                                executor.submit(get_dividend_data, s): s["symbol"]
-                                for s in summary_cache.values()
-                            }
-                            for future in concurrent.futures.as_completed(
-                                div_future_to_symbol
-                            ):
-                                res = future.result()
-                                symbol = div_future_to_symbol[future]
-                                if res:
-                                    dividend_cache[symbol] = res
 
                     last_update = datetime.now().strftime("%H:%M:%S")
 
@@ -542,36 +1035,16 @@ def fetch_portfolio():
 
                     # Update display with last update time and wait
                     msg = f"Last update: {last_update} | Ctrl+C to exit"
-                    live.update(
-                        build_display_group(
-                            list(summary_cache.values()),
-                            list(dividend_cache.values()),
-                            target_currency,
-                            msg,
-                            history_points,
-                            monthly_changes,
-                        )
-                    )
-
-                    # Smooth wait loop (5 seconds)
-                    start_wait = time.time()
-                    triggered = False
-                    for _ in range(50):
-                        time.sleep(0.1)
-                        # Trigger reload on focus gain or any key press
-                        if args.watch and sys.stdin.isatty():
-                            if select.select([sys.stdin], [], [], 0)[0]:
-                                while select.select([sys.stdin], [], [], 0)[0]:
-                                    sys.stdin.read(1)
-                                triggered = True
-                                break
-                        # Trigger reload if system was likely asleep (large time jump)
-                        if time.time() - start_wait > 10:
-                            triggered = True
-                            break
-
-                    if triggered:
-                        continue
+                    live.update(build_group(static, msg), refresh=True)
+
+                    # Wait up to 5 seconds in a single blocking call; a key
+                    # press or focus gain on the terminal triggers a reload
+                    if sys.stdin.isatty():
+                        if select.select([sys.stdin], [], [], 5)[0]:
+                            while select.select([sys.stdin], [], [], 0)[0]:
+                                sys.stdin.read(1)
+                    else:
+                        time.sleep(5)
             finally:
                 if args.watch and sys.stdin.isatty():
                     sys.stdout.write("\033[?1004l")
@@ -580,19 +1053,11 @@ def fetch_portfolio():
                         termios.tcsetattr(sys.stdin, termios.TCSANOW, old_attr)
 
         if not args.watch:
-            console.print(
-                build_display_group(
-                    list(summary_cache.values()),
-                    list(dividend_cache.values()),
-                    target_currency,
-                    "",
-                    history_points,
-                    monthly_changes,
-                )
-            )
+            get_console().print(build_group(static))
 
     except KeyboardInterrupt:
-        console.print("\n[yellow]Watch mode stopped.[/yellow]")
+        shutdown_executor()
+        get_console().print("\n[yellow]Watch mode stopped.[/yellow]")
         sys.exit(0)
 
 
@@ -0,0 +1,12 @@
+import pytest
+
+import stock
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(stock, "CACHE_DIR", tmp_path / "cache")
+    stock.fetch_ticker_meta.cache_clear()
+    stock.probe_currency.cache_clear()
+    stock._ticker_cache.clear()
+    monkeypatch.setattr(stock, "_bucket", {"tokens": stock.YAHOO_BURST, "ts": 0.0})
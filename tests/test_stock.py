@@ -1,4 +1,24 @@
-from stock import validate_currency, get_rate, load_config, build_display_group
+import pandas as pd
+import pytest
+
+from stock import (
+    validate_currency,
+    get_rate,
+    load_config,
+    build_display_group,
+    fetch_quotes,
+    fetch_rate,
+    history_from_closes,
+    history_pairs,
+    yf_ticker,
+    disk_cache,
+    get_ticker_meta,
+    get_dividend_data,
+    render_sparkline,
+    render_sparkline_np,
+    retry_transient,
+    yahoo_throttle,
+)
 
 
 def test_load_config_defaults(mocker):
@@ -8,6 +28,51 @@ def test_load_config_defaults(mocker):
     assert config["currency"] == "EUR"
 
 
+def test_load_config_from_file(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("holdings:\n  AAPL: 10\ncurrency: usd\n")
+    config = load_config(config_file)
+    assert config["holdings"] == {"AAPL": 10}
+    assert config["currency"] == "USD"
+
+
+def test_load_config_holdings_with_options(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        "holdings:\n  AAPL: 10\n  SXR8.DE:\n    qty: 40\n    div: false\n"
+    )
+    config = load_config(config_file)
+    assert config["holdings"] == {"AAPL": 10, "SXR8.DE": 40}
+    assert config["skip_dividends"] == {"SXR8.DE"}
+
+
+def test_load_config_toml(tmp_path):
+    pytest.importorskip("tomllib")
+    config_file = tmp_path / "config.toml"
+    config_file.write_text(
+        'currency = "sek"\n\n[holdings]\n"MC.PA" = 5\n"SXR8.DE" = { qty = 40, div = false }\n'
+    )
+    config = load_config(config_file)
+    assert config["holdings"] == {"MC.PA": 5, "SXR8.DE": 40}
+    assert config["currency"] == "SEK"
+    assert config["skip_dividends"] == {"SXR8.DE"}
+
+
+def test_load_config_toml_default_needs_tomllib(tmp_path, monkeypatch):
+    import stock
+
+    toml_file = tmp_path / "default.toml"
+    toml_file.write_text('currency = "sek"\n')
+    yaml_file = tmp_path / "default.yaml"
+    yaml_file.write_text("currency: usd\n")
+    monkeypatch.delenv("STOCK_PRICE_CONFIG", raising=False)
+    monkeypatch.setattr(stock, "DEFAULT_TOML_CONFIG_PATH", toml_file)
+    monkeypatch.setattr(stock, "DEFAULT_CONFIG_PATH", yaml_file)
+
+    monkeypatch.setattr(stock, "HAS_TOMLLIB", False)
+    assert load_config()["currency"] == "USD"
+
+
 def test_validate_currency_usd():
     assert validate_currency("USD") is True
 
@@ -17,6 +82,12 @@ def test_validate_currency_invalid():
     assert validate_currency("US") is False
 
 
+def test_validate_currency_known_codes_skip_network(mocker):
+    mock_ticker = mocker.patch("yfinance.Ticker")
+    assert validate_currency("eur") is True
+    mock_ticker.assert_not_called()
+
+
 def test_get_rate_same_currency():
     cache = {}
     rate = get_rate("EUR", "EUR", cache)
@@ -24,6 +95,81 @@ def test_get_rate_same_currency():
     assert cache == {}
 
 
+def test_get_rate_single_flight(mocker):
+    import threading
+    import time
+
+    calls = []
+
+    def slow_fetch(source, target):
+        calls.append((source, target))
+        time.sleep(0.05)
+        return 0.09
+
+    mocker.patch("stock.fetch_rate", side_effect=slow_fetch)
+    cache = {}
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get_rate("SEK", "EUR", cache)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [("SEK", "EUR")]
+    assert results == [0.09] * 4
+    assert cache == {"SEK": 0.09}
+
+
+def test_fetch_rate_falls_back_to_inverse_pair(mocker):
+    index = pd.to_datetime(["2024-01-02", "2024-01-03"])
+
+    def download(symbols, **kwargs):
+        if symbols != ["ISKNOK=X"]:
+            return pd.DataFrame()
+        columns = pd.MultiIndex.from_product([["Close"], symbols])
+        return pd.DataFrame([[12.0], [12.5]], index=index, columns=columns)
+
+    mock_download = mocker.patch("yfinance.download", side_effect=download)
+
+    assert fetch_rate("NOK", "ISK") == pytest.approx(1 / 12.5)
+    # Served from the disk cache on the second call
+    assert fetch_rate("NOK", "ISK") == pytest.approx(1 / 12.5)
+    assert [c.args[0] for c in mock_download.call_args_list] == [
+        ["NOKISK=X"],
+        ["ISKNOK=X"],
+    ]
+
+
+def test_fetch_rate_direct_pair_skips_inverse(mocker):
+    index = pd.to_datetime(["2024-01-02", "2024-01-03"])
+    columns = pd.MultiIndex.from_product([["Close"], ["SEKEUR=X"]])
+    df = pd.DataFrame([[0.087], [0.088]], index=index, columns=columns)
+    mock_download = mocker.patch("yfinance.download", return_value=df)
+
+    assert fetch_rate("SEK", "EUR") == pytest.approx(0.088)
+    mock_download.assert_called_once()
+
+
+def test_get_rate_rechecks_cache_under_lock(mocker):
+    class StaleFirstRead(dict):
+        # The first lookup misses, as if another thread stored the rate
+        # right after it
+        reads = 0
+
+        def get(self, key, default=None):
+            self.reads += 1
+            return None if self.reads == 1 else super().get(key, default)
+
+    fetch = mocker.patch("stock.fetch_rate")
+    cache = StaleFirstRead(SEK=0.09)
+
+    assert get_rate("SEK", "EUR", cache) == 0.09
+    fetch.assert_not_called()
+
+
 def test_build_display_group():
     summary_results = [
         {
@@ -56,7 +202,216 @@ def test_validate_currency_mocked(mocker):
     mock_ticker.fast_info = {"lastPrice": 1.1}
     mocker.patch("yfinance.Ticker", return_value=mock_ticker)
 
-    assert validate_currency("EUR") is True
+    assert validate_currency("NOK") is True
+    assert validate_currency("nok") is True
     import yfinance as yf
 
-    yf.Ticker.assert_called_with("USDEUR=X")
+    yf.Ticker.assert_called_once_with("USDNOK=X")
+
+
+def test_fetch_quotes_batched(mocker):
+    index = pd.to_datetime(["2024-01-02", "2024-01-03"])
+    columns = pd.MultiIndex.from_product([["Close"], ["AAPL", "MC.PA"]])
+    df = pd.DataFrame([[100.0, 700.0], [110.0, None]], index=index, columns=columns)
+    mock_download = mocker.patch("yfinance.download", return_value=df)
+
+    quotes = fetch_quotes(["AAPL", "MC.PA"])
+
+    mock_download.assert_called_once()
+    assert mock_download.call_args.args[0] == ["AAPL", "MC.PA"]
+    assert quotes["AAPL"]["price"] == 110.0
+    assert quotes["AAPL"]["prev_close"] == 100.0
+    assert quotes["AAPL"]["chg_pct"] == pytest.approx(10.0)
+    assert quotes["MC.PA"]["price"] == 700.0
+    assert quotes["MC.PA"]["prev_close"] is None
+    assert quotes["MC.PA"]["chg_pct"] == 0
+    assert str(quotes["MC.PA"]["last_date"]) == "2024-01-02"
+
+
+def test_history_from_closes_converts_and_skips_gaps():
+    index = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+    close_data = pd.DataFrame(
+        {
+            "AAPL": [100.0, None, 110.0],
+            "VOLV-B.ST": [200.0, None, 220.0],
+            "SEKUSD=X": [0.1, 0.1, None],
+        },
+        index=index,
+    )
+    holdings = {"AAPL": 2, "VOLV-B.ST": 10}
+    currencies = {"AAPL": "USD", "VOLV-B.ST": "SEK"}
+
+    totals, monthly = history_from_closes(close_data, holdings, "USD", currencies)
+
+    # The all-NaN day is dropped; a missing FX close falls back to 1.0
+    assert totals == pytest.approx([2 * 100 + 10 * 200 * 0.1, 2 * 110 + 10 * 220])
+    assert monthly["AAPL"] == pytest.approx(10.0)
+
+
+def test_history_pairs_use_ticker_metadata(mocker):
+    mock_ticker = mocker.Mock()
+    mock_ticker.fast_info = {"currency": "CHF", "timezone": "Europe/Zurich"}
+    mocker.patch("yfinance.Ticker", return_value=mock_ticker)
+
+    pairs = history_pairs(["NESN.SW", "MC.PA"], "EUR")
+
+    assert pairs == {"CHFEUR=X": "CHF"}
+
+
+def test_yf_ticker_is_memoized(mocker):
+    mock_ticker = mocker.patch("yfinance.Ticker", side_effect=lambda s: mocker.Mock())
+
+    first = yf_ticker("MEMO.TEST")
+    assert yf_ticker("MEMO.TEST") is first
+    mock_ticker.assert_called_once_with("MEMO.TEST")
+
+
+def test_disk_cache_ttl(mocker):
+    calls = []
+
+    @disk_cache(ttl_seconds=60)
+    def lookup(pair):
+        calls.append(pair)
+        return 1.5
+
+    assert lookup("SEKEUR=X") == 1.5
+    assert lookup("SEKEUR=X") == 1.5
+    assert calls == ["SEKEUR=X"]
+
+    mocker.patch("time.time", return_value=10**12)
+    assert lookup("SEKEUR=X") == 1.5
+    assert calls == ["SEKEUR=X", "SEKEUR=X"]
+
+
+def test_disk_cache_invalidate():
+    calls = []
+
+    @disk_cache(ttl_seconds=60)
+    def lookup(pair):
+        calls.append(pair)
+        return len(calls)
+
+    assert lookup("SEKEUR") == 1
+    lookup.invalidate("SEKEUR")
+    assert lookup("SEKEUR") == 2
+    assert lookup("SEKEUR") == 2
+
+
+def test_disk_cache_negative_ttl(mocker):
+    import time
+
+    calls = []
+
+    @disk_cache(ttl_seconds=60)
+    def positive_only(symbol):
+        calls.append(symbol)
+
+    @disk_cache(ttl_seconds=60, negative_ttl=30)
+    def with_negative(symbol):
+        calls.append(symbol)
+
+    positive_only("AAPL")
+    positive_only("AAPL")
+    assert calls == ["AAPL", "AAPL"]
+
+    calls.clear()
+    with_negative("AAPL")
+    assert with_negative("AAPL") is None
+    assert calls == ["AAPL"]
+
+    mocker.patch("time.time", return_value=time.time() + 31)
+    with_negative("AAPL")
+    assert calls == ["AAPL", "AAPL"]
+
+
+def test_get_dividend_data_refetches_after_ex_date(mocker):
+    from datetime import date, timedelta
+
+    upcoming = date.today() + timedelta(days=3)
+    tickers = []
+
+    def make_ticker(symbol):
+        ticker = mocker.Mock()
+        ticker.calendar = {"Ex-Dividend Date": upcoming}
+        ticker.history.return_value = pd.DataFrame({"Dividends": [0.0, 0.25]})
+        tickers.append(ticker)
+        return ticker
+
+    mocker.patch("yfinance.Ticker", side_effect=make_ticker)
+    summary = {"symbol": "AAPL", "qty": 10, "conv": 1.0, "source_currency": "USD"}
+
+    assert get_dividend_data(summary, date.today())["amt"] == 0.25
+    assert get_dividend_data(summary, date.today())["amt"] == 0.25
+    assert len(tickers) == 1
+
+    # Once the cached ex-date has passed the calendar is requested again
+    get_dividend_data(summary, upcoming + timedelta(days=1))
+    assert len(tickers) == 2
+
+
+def test_get_ticker_meta_from_suffix(mocker):
+    mock_ticker = mocker.patch("yfinance.Ticker")
+    assert get_ticker_meta("VOLV-B.ST") == ("SEK", "Europe/Stockholm")
+    mock_ticker.assert_not_called()
+
+
+def test_retry_transient_recovers(mocker):
+    sleep = mocker.patch("time.sleep")
+    attempts = []
+
+    @retry_transient
+    def flaky(symbol):
+        attempts.append(symbol)
+        if len(attempts) < 3:
+            raise ConnectionError("reset by peer")
+        return 42
+
+    assert flaky("AAPL") == 42
+    assert len(attempts) == 3
+    assert sleep.call_count == 2
+
+
+def test_yahoo_throttle_waits_after_burst(mocker):
+    import stock
+
+    sleep = mocker.patch("stock.time.sleep")
+    for _ in range(stock.YAHOO_BURST):
+        yahoo_throttle()
+    sleep.assert_not_called()
+
+    yahoo_throttle()
+    sleep.assert_called_once()
+    assert 0 < sleep.call_args.args[0] <= 1 / stock.YAHOO_RATE
+
+    # A batched download takes one token per symbol
+    sleep.reset_mock()
+    yahoo_throttle(5)
+    sleep.assert_called_once()
+    assert sleep.call_args.args[0] >= 5 / stock.YAHOO_RATE
+
+
+def test_render_sparkline_numpy_path_matches():
+    import math
+
+    values = [100 + 10 * math.sin(i / 5) for i in range(100)]
+    line = render_sparkline(values)
+    assert len(line) == 100
+    assert set(line) <= set("⎽⎼⎻⎺")
+    assert render_sparkline_np(values[:20]) == render_sparkline(values[:20])
+    assert render_sparkline_np([5.0, 5.0, 5.0]) == "───"
+
+
+def test_download_batches_fit_in_one_burst(mocker):
+    import stock
+
+    mock_download = mocker.patch("yfinance.download", return_value=pd.DataFrame())
+    sleep = mocker.patch("stock.time.sleep")
+    symbols = [f"SYM{i}" for i in range(25)]
+
+    fetch_quotes(symbols)
+
+    batches = [c.args[0] for c in mock_download.call_args_list]
+    assert sum(batches, []) == symbols
+    assert max(map(len, batches)) <= stock.YAHOO_BURST
+    # The first batch uses the full burst; later ones wait for new tokens
+    assert sleep.call_count == len(batches) - 1